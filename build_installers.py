@@ -5,98 +5,151 @@ Build script for creating Portsy installers for Windows and macOS
 
 import os
 import sys
-import subprocess
-import shutil
+import argparse
+import hashlib
+from collections import deque
 from pathlib import Path
 
+# Stable PyInstaller work directory so incremental builds reuse the analysis cache
+PYINSTALLER_WORKPATH = 'build/pyinstaller'
+
+# Inputs whose contents determine the build outputs
+MANIFEST_PATH = 'build/.manifest'
+MANIFEST_INPUTS = ['portsy.py', 'portsy.spec', 'README.md', 'LICENSE',
+                   'assets/icon.svg', 'assets/icon_256.png', 'build_installers.py']
+
+def _is_up_to_date(target, source):
+    """Check whether target exists and is at least as new as source"""
+    return (os.path.exists(source) and os.path.exists(target)
+            and os.path.getmtime(target) >= os.path.getmtime(source))
+
+def convert_svg_to_icons():
+    """Convert the application icon to every format the builds need"""
+    convert_svg_to_ico()
+    if sys.platform == 'darwin':
+        convert_svg_to_icns()
+
 def convert_svg_to_ico():
-    """Convert SVG icon to ICO format for Windows"""
-    try:
+    """Convert the pre-rendered icon to ICO format for Windows"""
+    # assets/icon.svg is the source of truth, but assets/icon_256.png is checked in
+    # as a 256px rasterization of it so builds don't need cairosvg. Re-render the
+    # PNG whenever the SVG changes.
+    
+    # Skip the encode work when the ICO is newer than its source
+    if _is_up_to_date('assets/icon.ico', 'assets/icon_256.png'):
+        print("✅ ICO icon is up to date")
+        return
+    
+    if os.path.exists('assets/icon_256.png'):
+        from concurrent.futures import ThreadPoolExecutor
         from PIL import Image
-        import cairosvg
-        
-        # Convert SVG to PNG first
-        cairosvg.svg2png(
-            url='assets/icon.svg',
-            write_to='assets/icon.png',
-            output_width=256,
-            output_height=256
-        )
         
-        # Convert PNG to ICO
-        img = Image.open('assets/icon.png')
-        img.save('assets/icon.ico', format='ICO', sizes=[(16,16), (32,32), (48,48), (64,64), (128,128), (256,256)])
+        # Build each ICO frame with a single LANCZOS resample from the 256px render.
+        # PIL releases the GIL while resampling, so the frames resize in parallel.
+        img = Image.open('assets/icon_256.png').convert('RGBA')
+        sizes = [(16,16), (32,32), (48,48), (64,64), (128,128), (256,256)]
+        with ThreadPoolExecutor(max_workers=min(len(sizes), os.cpu_count() or 2)) as executor:
+            frames = list(executor.map(lambda size: img.resize(size, Image.LANCZOS), sizes))
+        # The ICO encoder drops sizes larger than the base image, so save from the 256px frame
+        frames[-1].save('assets/icon.ico', format='ICO', sizes=sizes, append_images=frames[:-1])
         print("✅ Icon converted to ICO format")
         
-    except ImportError:
-        print("⚠️  cairosvg not available, creating simple ICO...")
-        # Create a simple colored icon as fallback
-        from PIL import Image, ImageDraw
-        
-        img = Image.new('RGBA', (256, 256), (37, 99, 235, 255))  # Blue background
-        draw = ImageDraw.Draw(img)
-        
-        # Draw simple port/network icon
-        draw.ellipse([96, 96, 160, 160], fill=(251, 191, 36, 255))  # Yellow center
-        draw.ellipse([120, 120, 136, 136], fill=(37, 99, 235, 255))  # Blue center
+    else:
+        print("⚠️  assets/icon_256.png not found, creating simple ICO...")
+        # Create a simple colored icon as fallback. The pixels are constant, so they
+        # are precomputed into assets/icon_fallback.raw (256x256 RGBA) rather than
+        # drawn with ImageDraw on every build.
+        from PIL import Image
         
-        # Add connection points
-        points = [(128, 64), (164, 92), (192, 128), (164, 164), (128, 192), (92, 164), (64, 128), (92, 92)]
-        for x, y in points:
-            draw.ellipse([x-8, y-8, x+8, y+8], fill=(96, 165, 250, 255))
+        if os.path.exists('assets/icon_fallback.raw'):
+            with open('assets/icon_fallback.raw', 'rb') as f:
+                img = Image.frombytes('RGBA', (256, 256), f.read())
+        else:
+            img = render_fallback_icon()
         
         img.save('assets/icon.ico', format='ICO', sizes=[(16,16), (32,32), (48,48), (64,64), (128,128), (256,256)])
         print("✅ Simple icon created")
 
-def build_windows_executable():
-    """Build Windows executable using PyInstaller"""
-    print("🔨 Building Windows executable...")
+def render_fallback_icon():
+    """Draw the 256x256 fallback icon that assets/icon_fallback.raw was rendered from"""
+    from PIL import Image, ImageDraw
     
-    cmd = [
-        'pyinstaller',
-        '--onefile',
-        '--console',
-        '--name', 'portsy',
-        '--icon', 'assets/icon.ico',
-        '--add-data=README.md:.',
-        '--add-data=LICENSE:.',
-        'portsy.py'
-    ]
+    img = Image.new('RGBA', (256, 256), (37, 99, 235, 255))  # Blue background
+    draw = ImageDraw.Draw(img)
+    
+    # Draw simple port/network icon
+    draw.ellipse([96, 96, 160, 160], fill=(251, 191, 36, 255))  # Yellow center
+    draw.ellipse([120, 120, 136, 136], fill=(37, 99, 235, 255))  # Blue center
+    
+    # Add connection points
+    points = [(128, 64), (164, 92), (192, 128), (164, 164), (128, 192), (92, 164), (64, 128), (92, 92)]
+    for x, y in points:
+        draw.ellipse([x-8, y-8, x+8, y+8], fill=(96, 165, 250, 255))
+    return img
+
+def convert_svg_to_icns():
+    """Convert the pre-rendered icon to ICNS format for macOS using iconutil"""
+    if _is_up_to_date('assets/icon.icns', 'assets/icon_256.png'):
+        print("✅ ICNS icon is up to date")
+        return
+    if not os.path.exists('assets/icon_256.png'):
+        print("⚠️  assets/icon_256.png not found, skipping ICNS icon")
+        return
+    
+    import shutil
+    import subprocess
+    from PIL import Image
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    # iconutil accepts a partial iconset, so only emit sizes the 256px render can fill
+    iconset = 'assets/icon.iconset'
+    os.makedirs(iconset, exist_ok=True)
+    img = Image.open('assets/icon_256.png').convert('RGBA')
+    for name, size in [('icon_16x16', 16), ('icon_16x16@2x', 32),
+                       ('icon_32x32', 32), ('icon_32x32@2x', 64),
+                       ('icon_128x128', 128), ('icon_128x128@2x', 256),
+                       ('icon_256x256', 256)]:
+        img.resize((size, size), Image.LANCZOS).save(f'{iconset}/{name}.png')
+    
+    result = subprocess.run(['iconutil', '-c', 'icns', '-o', 'assets/icon.icns', iconset],
+                            capture_output=True, text=True)
+    shutil.rmtree(iconset, ignore_errors=True)
     if result.returncode == 0:
-        print("✅ Windows executable built successfully")
-        print(f"   📁 Location: dist/portsy.exe")
+        print("✅ Icon converted to ICNS format")
     else:
-        print(f"❌ Windows build failed: {result.stderr}")
+        print(f"❌ ICNS conversion failed: {result.stderr}")
 
-def build_macos_app():
-    """Build macOS app bundle using PyInstaller"""
-    print("🔨 Building macOS app bundle...")
+def run_pyinstaller(cmd, tail_lines=200):
+    """Run PyInstaller, streaming its output and keeping only the tail for error reports"""
+    import subprocess
     
+    # bufsize=-1 uses a fully buffered pipe (io.DEFAULT_BUFFER_SIZE) so reads
+    # are coalesced instead of issuing a syscall per byte as bufsize=0 would
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            bufsize=-1, text=True)
+    tail = deque(maxlen=tail_lines)
+    for line in proc.stdout:
+        sys.stdout.write(line)
+        tail.append(line)
+    proc.stdout.close()
+    return proc.wait(), ''.join(tail)
+
+def build_from_spec(upx=False):
+    """Build the executable (and macOS app bundle) from portsy.spec using PyInstaller"""
     cmd = [
         'pyinstaller',
-        '--onefile',
-        '--windowed',
-        '--name', 'Portsy',
-        '--icon', 'assets/icon.ico',
-        '--add-data', 'README.md:.',
-        '--add-data', 'LICENSE:.',
-        'portsy.py'
+        '--noconfirm',
+        '--workpath', PYINSTALLER_WORKPATH,
+        '--distpath', 'dist',
+        'portsy.spec'
     ]
+    # PyInstaller rejects command-line build options alongside a spec file,
+    # so the UPX choice reaches portsy.spec through the environment
+    os.environ['PORTSY_UPX'] = '1' if upx else '0'
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode == 0:
-        print("✅ macOS app bundle built successfully")
-        print(f"   📁 Location: dist/Portsy.app")
-    else:
-        print(f"❌ macOS build failed: {result.stderr}")
+    return run_pyinstaller(cmd)
 
-def create_installer_scripts():
-    """Create installer scripts for easy installation"""
-    
-    # Windows batch installer
-    windows_installer = """@echo off
+# Windows batch installer
+WINDOWS_INSTALLER = """@echo off
 echo Installing Portsy...
 echo.
 
@@ -111,16 +164,33 @@ if errorlevel 1 (
 
 REM Install Portsy
 echo Installing Portsy via pip...
-pip install psutil requests
+pip install --only-binary=:all: --upgrade --no-input --disable-pip-version-check "psutil>=5.9,<6" "requests>=2.31,<3"
 if errorlevel 1 (
     echo Failed to install dependencies
     pause
     exit /b 1
 )
 
-REM Copy executable to a standard location
-if not exist "%USERPROFILE%\\AppData\\Local\\Portsy" mkdir "%USERPROFILE%\\AppData\\Local\\Portsy"
-copy portsy.exe "%USERPROFILE%\\AppData\\Local\\Portsy\\"
+REM The build writes the application folder to dist\\portsy next to installers\\
+for %%I in ("%~dp0..\\dist\\portsy") do set "PORTSY_SRC=%%~fI"
+if not exist "%PORTSY_SRC%\\portsy.exe" (
+    echo Could not find %PORTSY_SRC%\\portsy.exe
+    echo Please run build_installers.py first.
+    pause
+    exit /b 1
+)
+
+REM Drop a junction left by an earlier install so it is never copied onto
+REM itself; rmdir removes only the link, not the folder it points to
+dir /AL /B "%USERPROFILE%\\AppData\\Local" 2>nul | findstr /X /I "Portsy" >nul && rmdir "%USERPROFILE%\\AppData\\Local\\Portsy"
+
+REM Link the application folder into a standard location with a directory
+REM junction (no data copy); fall back to copying if the junction can't be made
+if not exist "%USERPROFILE%\\AppData\\Local\\Portsy" (
+    mklink /J "%USERPROFILE%\\AppData\\Local\\Portsy" "%PORTSY_SRC%" >nul 2>&1 || xcopy /E /I /Y "%PORTSY_SRC%" "%USERPROFILE%\\AppData\\Local\\Portsy\\"
+) else (
+    xcopy /E /I /Y "%PORTSY_SRC%" "%USERPROFILE%\\AppData\\Local\\Portsy\\"
+)
 
 REM Add to PATH (requires admin rights)
 echo.
@@ -132,8 +202,8 @@ echo Run: portsy --help
 pause
 """
 
-    # macOS/Linux shell installer
-    unix_installer = """#!/bin/bash
+# macOS/Linux shell installer
+UNIX_INSTALLER = """#!/bin/bash
 
 echo "🚀 Installing Portsy..."
 echo
@@ -147,71 +217,156 @@ fi
 
 # Install dependencies
 echo "📦 Installing dependencies..."
-pip3 install psutil requests
+pip3 install --only-binary=:all: --upgrade --no-input --disable-pip-version-check "psutil>=5.9,<6" "requests>=2.31,<3"
 if [ $? -ne 0 ]; then
     echo "❌ Failed to install dependencies"
     exit 1
 fi
 
-# Copy to /usr/local/bin (requires sudo)
+# Install a root-owned copy of a directory; on APFS, cp -c clones the files
+# (no data copy), elsewhere fall back to a regular copy
+install_tree() {
+    sudo rm -rf "$2"
+    if ! sudo cp -Rc "$1" "$2" 2>/dev/null; then
+        sudo rm -rf "$2"
+        sudo cp -R "$1" "$2"
+    fi
+}
+
+install_bundle() {
+    install_tree dist/portsy /usr/local/lib/portsy
+    sudo ln -sf /usr/local/lib/portsy/portsy /usr/local/bin/portsy
+}
+
+install_app() {
+    install_tree dist/Portsy.app /usr/local/lib/Portsy.app
+    sudo ln -sf /usr/local/lib/Portsy.app/Contents/MacOS/portsy /usr/local/bin/portsy
+}
+
+# Install a copy of the script itself; a hardlink would share its mode
+# with the checkout, so making it executable would change portsy.py too
+install_script() {
+    sudo install -m 755 portsy.py /usr/local/bin/portsy
+}
+
+# Install to /usr/local/bin (requires sudo)
 echo "🔧 Installing portsy command..."
 if [ "$(uname)" == "Darwin" ]; then
     # macOS
-    if [ -f "dist/Portsy.app/Contents/MacOS/Portsy" ]; then
-        sudo cp dist/Portsy.app/Contents/MacOS/Portsy /usr/local/bin/portsy
+    if [ -d "dist/portsy" ]; then
+        install_bundle
+    elif [ -f "dist/Portsy.app/Contents/MacOS/portsy" ]; then
+        install_app
     else
-        sudo cp portsy.py /usr/local/bin/portsy
+        install_script
     fi
 else
     # Linux
-    sudo cp portsy.py /usr/local/bin/portsy
+    if [ -d "dist/portsy" ]; then
+        install_bundle
+    else
+        install_script
+    fi
 fi
 
-sudo chmod +x /usr/local/bin/portsy
-
 echo "✅ Installation complete!"
 echo "Run: portsy --help"
 """
 
-    # Write installer scripts
-    with open('installers/install_windows.bat', 'w') as f:
-        f.write(windows_installer)
-    
-    with open('installers/install_unix.sh', 'w') as f:
-        f.write(unix_installer)
+def _write_if_changed(path, content, mode=None, newline='\n'):
+    """Write content to path unless the file already holds identical bytes"""
+    data = content.replace('\n', newline).encode('utf-8')
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
     
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    if mode is not None:
+        os.chmod(path, mode)
+    return True
+
+def create_installer_scripts():
+    """Create installer scripts for easy installation"""
+    # cmd.exe expects CRLF line endings whatever platform the build runs on
+    _write_if_changed('installers/install_windows.bat', WINDOWS_INSTALLER, newline='\r\n')
     # Make Unix installer executable
-    os.chmod('installers/install_unix.sh', 0o755)
+    _write_if_changed('installers/install_unix.sh', UNIX_INSTALLER, mode=0o755)
     
     print("✅ Installer scripts created")
     print("   📁 Windows: installers/install_windows.bat")
     print("   📁 Unix: installers/install_unix.sh")
 
+def compute_manifest(upx=False):
+    """Hash the build inputs so unchanged sources can skip the build"""
+    h = hashlib.blake2b(digest_size=16)
+    for path in MANIFEST_INPUTS:
+        h.update(path.encode())
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                h.update(f.read())
+    h.update(b'upx' if upx else b'noupx')
+    return h.hexdigest()
+
 def main():
     """Main build process"""
+    parser = argparse.ArgumentParser(description="Build Portsy installers")
+    parser.add_argument('--fresh', action='store_true',
+                       help='Discard the cached PyInstaller work directory before building')
+    parser.add_argument('--upx', action='store_true',
+                       help='Compress bundled binaries with UPX (smaller, but slower to build and start)')
+    parser.add_argument('--force', action='store_true',
+                       help='Rebuild even if no build inputs changed since the last build')
+    args = parser.parse_args()
+    
     print("🏗️  Building Portsy Installers")
     print("=" * 40)
     
+    manifest = compute_manifest(args.upx)
+    if not (args.force or args.fresh) and os.path.isdir('dist/portsy') and os.path.exists(MANIFEST_PATH):
+        with open(MANIFEST_PATH) as f:
+            if f.read().strip() == manifest:
+                print("✓ up-to-date, skipping (use --force to rebuild)")
+                return
+    
+    if args.fresh:
+        import shutil
+        shutil.rmtree(PYINSTALLER_WORKPATH, ignore_errors=True)
+        print("🧹 Cleared PyInstaller cache")
+    
     # Create directories
     os.makedirs('assets', exist_ok=True)
     os.makedirs('installers', exist_ok=True)
     os.makedirs('dist', exist_ok=True)
     
-    # Convert icon
-    convert_svg_to_ico()
-    
-    # Build executables
-    build_windows_executable()
+    # Convert icons
+    convert_svg_to_icons()
     
-    if sys.platform == 'darwin':
-        build_macos_app()
+    # Build executables; the spec shares one Analysis across all targets
+    print("🔨 Building executables from portsy.spec...")
+    returncode, output = build_from_spec(args.upx)
+    if returncode == 0:
+        print("✅ Executables built successfully")
+        print("   📁 Location: dist/portsy/")
+        if sys.platform == 'darwin':
+            print("   📁 Location: dist/Portsy.app")
+    else:
+        print(f"❌ Build failed:\n{output}")
     
     # Create installer scripts
     create_installer_scripts()
     
+    # Record the inputs of this successful build
+    if returncode == 0:
+        os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+        with open(MANIFEST_PATH, 'w') as f:
+            f.write(manifest)
+    
     print("\n🎉 Build process complete!")
     print("\nCreated files:")
-    print("📁 dist/portsy.exe (Windows)")
+    print("📁 dist/portsy/portsy.exe (Windows)")
     if sys.platform == 'darwin':
         print("📁 dist/Portsy.app (macOS)")
     print("📁 installers/install_windows.bat")
@@ -12,27 +12,57 @@ fi
 
 # Install dependencies
 echo "📦 Installing dependencies..."
-pip3 install psutil requests
+pip3 install --only-binary=:all: --upgrade --no-input --disable-pip-version-check "psutil>=5.9,<6" "requests>=2.31,<3"
 if [ $? -ne 0 ]; then
     echo "❌ Failed to install dependencies"
     exit 1
 fi
 
-# Copy to /usr/local/bin (requires sudo)
+# Install a root-owned copy of a directory; on APFS, cp -c clones the files
+# (no data copy), elsewhere fall back to a regular copy
+install_tree() {
+    sudo rm -rf "$2"
+    if ! sudo cp -Rc "$1" "$2" 2>/dev/null; then
+        sudo rm -rf "$2"
+        sudo cp -R "$1" "$2"
+    fi
+}
+
+install_bundle() {
+    install_tree dist/portsy /usr/local/lib/portsy
+    sudo ln -sf /usr/local/lib/portsy/portsy /usr/local/bin/portsy
+}
+
+install_app() {
+    install_tree dist/Portsy.app /usr/local/lib/Portsy.app
+    sudo ln -sf /usr/local/lib/Portsy.app/Contents/MacOS/portsy /usr/local/bin/portsy
+}
+
+# Install a copy of the script itself; a hardlink would share its mode
+# with the checkout, so making it executable would change portsy.py too
+install_script() {
+    sudo install -m 755 portsy.py /usr/local/bin/portsy
+}
+
+# Install to /usr/local/bin (requires sudo)
 echo "🔧 Installing portsy command..."
 if [ "$(uname)" == "Darwin" ]; then
     # macOS
-    if [ -f "dist/Portsy.app/Contents/MacOS/Portsy" ]; then
-        sudo cp dist/Portsy.app/Contents/MacOS/Portsy /usr/local/bin/portsy
+    if [ -d "dist/portsy" ]; then
+        install_bundle
+    elif [ -f "dist/Portsy.app/Contents/MacOS/portsy" ]; then
+        install_app
     else
-        sudo cp portsy.py /usr/local/bin/portsy
+        install_script
     fi
 else
     # Linux
-    sudo cp portsy.py /usr/local/bin/portsy
+    if [ -d "dist/portsy" ]; then
+        install_bundle
+    else
+        install_script
+    fi
 fi
 
-sudo chmod +x /usr/local/bin/portsy
-
 echo "✅ Installation complete!"
 echo "Run: portsy --help"
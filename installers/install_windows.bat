@@ -1,34 +1,51 @@
-@echo off
-echo Installing Portsy...
-echo.
-
-REM Check if Python is available
-python --version >nul 2>&1
-if errorlevel 1 (
-    echo Python is not installed or not in PATH.
-    echo Please install Python from https://python.org
-    pause
-    exit /b 1
-)
-
-REM Install Portsy
-echo Installing Portsy via pip...
-pip install psutil requests
-if errorlevel 1 (
-    echo Failed to install dependencies
-    pause
-    exit /b 1
-)
-
-REM Copy executable to a standard location
-if not exist "%USERPROFILE%\AppData\Local\Portsy" mkdir "%USERPROFILE%\AppData\Local\Portsy"
-copy portsy.exe "%USERPROFILE%\AppData\Local\Portsy\"
-
-REM Add to PATH (requires admin rights)
-echo.
-echo To use 'portsy' command globally, add the following to your PATH:
-echo %USERPROFILE%\AppData\Local\Portsy
-echo.
-echo Installation complete!
-echo Run: portsy --help
-pause
+@echo off
+echo Installing Portsy...
+echo.
+
+REM Check if Python is available
+python --version >nul 2>&1
+if errorlevel 1 (
+    echo Python is not installed or not in PATH.
+    echo Please install Python from https://python.org
+    pause
+    exit /b 1
+)
+
+REM Install Portsy
+echo Installing Portsy via pip...
+pip install --only-binary=:all: --upgrade --no-input --disable-pip-version-check "psutil>=5.9,<6" "requests>=2.31,<3"
+if errorlevel 1 (
+    echo Failed to install dependencies
+    pause
+    exit /b 1
+)
+
+REM The build writes the application folder to dist\portsy next to installers\
+for %%I in ("%~dp0..\dist\portsy") do set "PORTSY_SRC=%%~fI"
+if not exist "%PORTSY_SRC%\portsy.exe" (
+    echo Could not find %PORTSY_SRC%\portsy.exe
+    echo Please run build_installers.py first.
+    pause
+    exit /b 1
+)
+
+REM Drop a junction left by an earlier install so it is never copied onto
+REM itself; rmdir removes only the link, not the folder it points to
+dir /AL /B "%USERPROFILE%\AppData\Local" 2>nul | findstr /X /I "Portsy" >nul && rmdir "%USERPROFILE%\AppData\Local\Portsy"
+
+REM Link the application folder into a standard location with a directory
+REM junction (no data copy); fall back to copying if the junction can't be made
+if not exist "%USERPROFILE%\AppData\Local\Portsy" (
+    mklink /J "%USERPROFILE%\AppData\Local\Portsy" "%PORTSY_SRC%" >nul 2>&1 || xcopy /E /I /Y "%PORTSY_SRC%" "%USERPROFILE%\AppData\Local\Portsy\"
+) else (
+    xcopy /E /I /Y "%PORTSY_SRC%" "%USERPROFILE%\AppData\Local\Portsy\"
+)
+
+REM Add to PATH (requires admin rights)
+echo.
+echo To use 'portsy' command globally, add the following to your PATH:
+echo %USERPROFILE%\AppData\Local\Portsy
+echo.
+echo Installation complete!
+echo Run: portsy --help
+pause
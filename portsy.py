@@ -5,22 +5,52 @@ A highly optimized tool for detecting running services, exposed routes, and dupl
 """
 
 import socket
-import subprocess
+import selectors
+import asyncio
+import errno
 import json
 import threading
 import queue
 import time
 import requests
+from requests.adapters import HTTPAdapter
 import argparse
 import sys
 import os
-from typing import Dict, List, Tuple, Optional, Set
-from dataclasses import dataclass, asdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Tuple, Optional, Set, Iterator, AsyncIterator
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict, OrderedDict
+from functools import lru_cache
 import psutil
 from urllib.parse import urlparse
 import hashlib
 
+# Try to import async HTTP dependencies for concurrent route discovery
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+# Service fingerprints keep only 8 hex chars, so cryptographic strength is
+# unused; prefer a fast SIMD/non-cryptographic hash when one is installed
+try:
+    from blake3 import blake3 as fingerprint_hash
+except ImportError:
+    try:
+        import xxhash
+        fingerprint_hash = xxhash.xxh3_64
+    except ImportError:
+        fingerprint_hash = hashlib.md5
+
+# Try to import orjson for faster JSON export
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Try to import GUI dependencies
 try:
     import tkinter as tk
@@ -50,6 +80,45 @@ class Service:
             self.headers = {}
 
 
+@dataclass
+class ServiceTable:
+    """Column-oriented (struct-of-arrays) view of services for grouping passes"""
+    process_names: List[str] = field(default_factory=list)
+    fingerprints: List[Optional[str]] = field(default_factory=list)
+    services: List[Service] = field(default_factory=list)
+    
+    @classmethod
+    def from_services(cls, services: Dict[int, Service]) -> 'ServiceTable':
+        """Build a table from a port -> Service mapping"""
+        table = cls()
+        for service in services.values():
+            table.process_names.append(service.process_name)
+            table.fingerprints.append(service.fingerprint)
+            table.services.append(service)
+        return table
+    
+    def materialize(self, indices: List[int]) -> List[Service]:
+        """Return the full Service records for the given row indices"""
+        return [self.services[i] for i in indices]
+
+
+# Scans always target IPv4 localhost
+LOCAL_IP = '127.0.0.1'
+# Listening addresses that accept connections made to localhost
+LOCAL_LISTEN_ADDRS = frozenset({'127.0.0.1', '0.0.0.0', '::', '::1'})
+
+# On Linux, SOCK_NONBLOCK creates sockets already non-blocking, saving the
+# extra ioctl/fcntl syscall that setblocking(False) makes for every socket
+HAS_SOCK_NONBLOCK = hasattr(socket, 'SOCK_NONBLOCK')
+NONBLOCKING_STREAM = socket.SOCK_STREAM | getattr(socket, 'SOCK_NONBLOCK', 0)
+
+# connect_ex() codes for a non-blocking connect that is still in progress;
+# Windows reports WSAEWOULDBLOCK instead of EINPROGRESS/EWOULDBLOCK
+CONNECT_IN_PROGRESS = frozenset(code for code in (errno.EINPROGRESS, errno.EWOULDBLOCK,
+                                                  getattr(errno, 'WSAEWOULDBLOCK', None))
+                                if code is not None)
+
+
 class PortScanner:
     """High-performance port scanner with process detection"""
     
@@ -81,63 +150,132 @@ class PortScanner:
         }
     }
     
-    def __init__(self, timeout: float = 0.5, max_workers: int = 100):
+    def __init__(self, timeout: float = 0.5):
         self.timeout = timeout
-        self.max_workers = max_workers
         self.services: Dict[int, Service] = {}
         
-    def scan_port(self, port: int) -> bool:
-        """Check if a port is open using socket"""
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(self.timeout)
-                result = sock.connect_ex(('127.0.0.1', port))
-                return result == 0
-        except:
-            return False
-    
-    def get_process_info(self, port: int) -> Optional[Tuple[int, str, str]]:
-        """Get process info for a port using lsof"""
+    def _batch_size(self) -> int:
+        """Number of sockets to keep open at once, respecting the fd limit"""
+        if sys.platform == 'win32':
+            # select() on Windows is limited to 512 sockets
+            return 500
         try:
-            # Use lsof for macOS/Linux
-            cmd = f"lsof -i :{port} -sTCP:LISTEN -t"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            if result.stdout:
-                pid = int(result.stdout.strip().split('\n')[0])
-                process = psutil.Process(pid)
-                return pid, process.name(), ' '.join(process.cmdline())
-        except:
-            pass
-        return None
+            import resource
+            soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+            # Leave headroom for the files and sockets the process already has open
+            return max(64, min(2048, soft - 64))
+        except (ImportError, ValueError, OSError):
+            return 256
     
-    def scan_ports(self, start_port: int = 1, end_port: int = 65535, preset: str = None) -> Dict[int, Service]:
-        """Scan a range of ports in parallel"""
+    def _scan_batch(self, ports: List[int]) -> List[int]:
+        """Connect to one batch of ports at once, multiplexed on one selector"""
         open_ports = []
+        sel = selectors.DefaultSelector()
+        sockets = []
+        try:
+            for port in ports:
+                sock = socket.socket(socket.AF_INET, NONBLOCKING_STREAM)
+                if not HAS_SOCK_NONBLOCK:
+                    sock.setblocking(False)
+                sockets.append(sock)
+                err = sock.connect_ex((LOCAL_IP, port))
+                if err in (0, errno.EISCONN):
+                    open_ports.append(port)
+                elif err in CONNECT_IN_PROGRESS:
+                    sel.register(sock, selectors.EVENT_WRITE, port)
+            
+            # Wait for the whole batch; a socket becomes writable once its
+            # connect completes, and SO_ERROR tells us whether it succeeded
+            deadline = time.monotonic() + self.timeout
+            while sel.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                for key, _ in sel.select(timeout=remaining):
+                    sel.unregister(key.fileobj)
+                    if key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                        open_ports.append(key.data)
+        finally:
+            sel.close()
+            for sock in sockets:
+                sock.close()
+        return open_ports
+    
+    def _open_port_batches(self, ports) -> Iterator[List[int]]:
+        """Find open ports with non-blocking connects, yielding them batch by batch"""
+        ports = list(ports)
+        batch_size = self._batch_size()
+        for i in range(0, len(ports), batch_size):
+            yield self._scan_batch(ports[i:i + batch_size])
+    
+    def get_listeners(self, addrs: Optional[Set[str]] = None) -> Optional[Dict[int, int]]:
+        """Map listening TCP ports to their owning PIDs from one system-wide snapshot
         
-        # Use preset if specified
+        Only sockets bound to one of addrs are included, if given. Returns None when
+        the snapshot needs more privileges than we have (e.g. macOS without root),
+        since the result would be incomplete.
+        """
+        try:
+            return {conn.laddr.port: conn.pid
+                    for conn in psutil.net_connections(kind='tcp')
+                    if conn.status == psutil.CONN_LISTEN and conn.pid
+                    and (addrs is None or conn.laddr.ip in addrs)}
+        except psutil.AccessDenied:
+            return None
+    
+    def get_listening_pids(self) -> Dict[int, int]:
+        """Map listening TCP ports to their owning PIDs"""
+        listening = self.get_listeners()
+        if listening is not None:
+            return listening
+        
+        # macOS needs root for a system-wide snapshot; fall back to the
+        # processes we are allowed to inspect
+        listening = {}
+        for process in psutil.process_iter():
+            try:
+                connections = getattr(process, 'net_connections', None) or process.connections
+                for conn in connections(kind='tcp'):
+                    if conn.status == psutil.CONN_LISTEN:
+                        listening[conn.laddr.port] = process.pid
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return listening
+    
+    def get_process_info(self, pids: Set[int]) -> Dict[int, Tuple[str, str]]:
+        """Read name and command line once per PID, even if it listens on many ports"""
+        process_info = {}
+        for pid in pids:
+            try:
+                # as_dict() reads both attributes in a single oneshot() pass
+                info = psutil.Process(pid).as_dict(attrs=['name', 'cmdline'])
+            except psutil.NoSuchProcess:
+                continue
+            process_info[pid] = (info['name'] or '', ' '.join(info['cmdline'] or []))
+        return process_info
+    
+    def _ports_to_scan(self, start_port: int, end_port: int, preset: str = None):
+        """Resolve a preset or an explicit range into the ports to scan"""
         if preset and preset in self.SCAN_PRESETS:
-            port_ranges = self.SCAN_PRESETS[preset]['ranges']
             ports_to_scan = []
-            for start, end in port_ranges:
+            for start, end in self.SCAN_PRESETS[preset]['ranges']:
                 ports_to_scan.extend(range(start, end + 1))
-        else:
-            ports_to_scan = range(start_port, end_port + 1)
+            return ports_to_scan
+        return range(start_port, end_port + 1)
+    
+    def _add_services(self, open_ports: List[int], listening: Dict[int, int],
+                      process_info: Dict[int, Tuple[str, str]]) -> List[Service]:
+        """Record a Service for each open port we can attribute to a process
         
-        # First, quickly scan for open ports
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {executor.submit(self.scan_port, port): port 
-                      for port in ports_to_scan}
-            
-            for future in as_completed(futures):
-                port = futures[future]
-                if future.result():
-                    open_ports.append(port)
+        process_info is filled in as new PIDs show up, so each PID is only read once.
+        """
+        port_pids = {port: listening[port] for port in open_ports if port in listening}
+        process_info.update(self.get_process_info(set(port_pids.values()) - process_info.keys()))
         
-        # Then get process info for open ports
-        for port in open_ports:
-            process_info = self.get_process_info(port)
-            if process_info:
-                pid, name, cmd = process_info
+        services = []
+        for port, pid in port_pids.items():
+            if pid in process_info:
+                name, cmd = process_info[pid]
                 self.services[port] = Service(
                     port=port,
                     pid=pid,
@@ -145,14 +283,86 @@ class PortScanner:
                     process_cmd=cmd,
                     protocol='tcp'
                 )
+                services.append(self.services[port])
+        return services
+    
+    def _find_open_ports(self, ports_to_scan) -> Tuple[Dict[int, int], Iterator[List[int]]]:
+        """Return the port -> PID listener map and batches of open ports to attribute
         
+        For localhost the kernel's listener table already answers the scan, so the
+        ports are only probed when that snapshot can't be read in full.
+        """
+        listening = self.get_listeners(LOCAL_LISTEN_ADDRS)
+        if listening is not None:
+            wanted = set(ports_to_scan)
+            return listening, iter([[port for port in listening if port in wanted]])
+        return self.get_listening_pids(), self._open_port_batches(ports_to_scan)
+    
+    def scan_ports(self, start_port: int = 1, end_port: int = 65535, preset: str = None) -> Dict[int, Service]:
+        """Scan a range of ports in parallel"""
+        ports_to_scan = self._ports_to_scan(start_port, end_port, preset)
+        listening, batches = self._find_open_ports(ports_to_scan)
+        open_ports = [port for batch in batches for port in batch]
+        self._add_services(open_ports, listening, {})
         return self.services
     
+    async def scan_ports_stream(self, start_port: int = 1, end_port: int = 65535,
+                                preset: str = None) -> AsyncIterator[Service]:
+        """Yield services batch by batch as their ports are found open
+        
+        Batches are scanned on a worker thread, so the caller can start work on
+        each service (e.g. route discovery) while later batches are still scanning.
+        """
+        loop = asyncio.get_running_loop()
+        ports_to_scan = self._ports_to_scan(start_port, end_port, preset)
+        process_info = {}
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # The listener snapshot is taken up front so services can be
+            # attributed as soon as their batch completes
+            listening, batches = await loop.run_in_executor(
+                executor, self._find_open_ports, ports_to_scan)
+            while (open_ports := await loop.run_in_executor(executor, next, batches, None)) is not None:
+                for service in self._add_services(open_ports, listening, process_info):
+                    yield service
+    
     def get_scan_presets(self) -> Dict[str, str]:
         """Get available scan presets"""
         return {name: info['description'] for name, info in self.SCAN_PRESETS.items()}
 
 
+class ProbeCache:
+    """Bounded LRU cache of HEAD probe statuses keyed by (port, path), with a TTL"""
+    
+    def __init__(self, ttl: float = 60.0, max_size: int = 4096):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        
+    def get(self, port: int, path: str) -> Optional[int]:
+        """Return the cached status for a probe, or None if missing or expired"""
+        key = (port, path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            timestamp, status = entry
+            if time.monotonic() - timestamp > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return status
+    
+    def set(self, port: int, path: str, status: int) -> None:
+        """Store a probe status, evicting the least recently used entry when full"""
+        key = (port, path)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), status)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
 class RouteDiscovery:
     """Discovers HTTP routes and endpoints"""
     
@@ -248,48 +458,211 @@ class RouteDiscovery:
         ]
     }
     
-    # Combine all paths for full discovery
-    ALL_PATHS = []
-    for paths in FRAMEWORK_PATHS.values():
-        ALL_PATHS.extend(paths)
-    ALL_PATHS = list(set(ALL_PATHS))  # Remove duplicates
+    # Combine all paths for full discovery, de-duplicated and in a stable
+    # order with the shortest (most common) paths first
+    ALL_PATHS = tuple(sorted({path for paths in FRAMEWORK_PATHS.values() for path in paths},
+                             key=lambda path: (len(path), path)))
+    COMMON_PATHS = tuple(FRAMEWORK_PATHS['common'])
     
-    def __init__(self, timeout: float = 2.0, comprehensive: bool = False):
+    # Server / X-Powered-By substrings that identify a framework bucket above.
+    # Checked in order, so more specific tokens come before generic ones.
+    FINGERPRINT_MAP = {
+        'uvicorn': 'fastapi',
+        'hypercorn': 'fastapi',
+        'werkzeug': 'flask',
+        'gunicorn': 'flask',
+        'wsgiserver': 'django',
+        'express': 'express',
+        'puma': 'rails',
+        'phusion passenger': 'rails',
+        'php': 'laravel',
+        'apache-coyote': 'spring',
+        'tornadoserver': 'jupyter',
+        'ollama': 'ollama',
+        'nginx': 'nginx',
+        'apache': 'apache',
+    }
+    
+    def __init__(self, timeout: float = 2.0, comprehensive: bool = False,
+                 cache: Optional[ProbeCache] = None):
         self.timeout = timeout
         self.comprehensive = comprehensive
-        self.paths_to_check = self.ALL_PATHS if comprehensive else self.FRAMEWORK_PATHS['common']
+        self.cache = cache if cache is not None else ProbeCache()
+        self.paths_to_check = self.ALL_PATHS if comprehensive else self.COMMON_PATHS
+        
+        # Shared keep-alive session so probes reuse connections instead of
+        # opening a new socket per request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         
     def discover_routes(self, service: Service) -> None:
         """Discover HTTP routes for a service"""
         base_url = f"http://localhost:{service.port}"
         
+        # First, try to get the root; if nothing answers HTTP there, the path
+        # probes would all fail the same way
         try:
-            # First, try to get the root
-            response = requests.get(base_url, timeout=self.timeout, allow_redirects=True)
-            service.response_time = response.elapsed.total_seconds()
-            service.headers = dict(response.headers)
-            
-            # Check paths based on mode
-            found_routes = []
-            for path in self.paths_to_check:
+            response = self.session.get(base_url, timeout=self.timeout, allow_redirects=True)
+        except (requests.exceptions.RequestException, ValueError):
+            service.routes = []
+            return
+        service.response_time = response.elapsed.total_seconds()
+        service.headers = dict(response.headers)
+        if self._rejects_http(response.status_code, response.content[:512].decode('latin-1')):
+            service.routes = []
+            return
+        
+        # Check paths based on mode and detected framework
+        found_routes = []
+        for path in self.select_paths(service.headers):
+            status = self.cache.get(service.port, path)
+            if status is None:
                 try:
                     url = f"{base_url}{path}"
-                    resp = requests.head(url, timeout=self.timeout, allow_redirects=True)
-                    if resp.status_code < 400:
-                        found_routes.append(path)
-                except:
-                    pass
-            
-            service.routes = found_routes
-            
-            # Generate fingerprint based on headers and routes
-            fingerprint_data = f"{service.headers.get('Server', '')}"
-            fingerprint_data += f"{service.headers.get('X-Powered-By', '')}"
-            fingerprint_data += f"{','.join(sorted(service.routes))}"
-            service.fingerprint = hashlib.md5(fingerprint_data.encode()).hexdigest()[:8]
-            
-        except:
-            pass
+                    resp = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+                except (requests.exceptions.RequestException, ValueError):
+                    continue
+                status = resp.status_code
+                self.cache.set(service.port, path, status)
+            if status < 400:
+                found_routes.append(path)
+        
+        service.routes = found_routes
+        self._fingerprint(service)
+    
+    @staticmethod
+    def _rejects_http(status: int, body: str) -> bool:
+        """Check for a root response that means the port doesn't really speak HTTP
+        
+        e.g. nginx answering a plain HTTP request on a TLS port
+        """
+        return status == 400 and 'bad request' in body.lower()
+    
+    @staticmethod
+    def _server_headers(headers: Dict[str, str]) -> Tuple[str, str]:
+        """Return the Server and X-Powered-By values, matching header names case-insensitively
+        
+        Servers differ in how they case header names (uvicorn sends them lowercase),
+        and so do the HTTP clients that report them back.
+        """
+        lowered = {name.lower(): value for name, value in headers.items()}
+        return lowered.get('server', ''), lowered.get('x-powered-by', '')
+    
+    def detect_framework(self, headers: Dict[str, str]) -> Optional[str]:
+        """Guess the framework from the Server and X-Powered-By headers"""
+        server, powered_by = self._server_headers(headers)
+        return self._match_framework(f"{server} {powered_by}".lower())
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _match_framework(server: str) -> Optional[str]:
+        """Map a lowercased server string to a framework (memoized per string)"""
+        for token, framework in RouteDiscovery.FINGERPRINT_MAP.items():
+            if token in server:
+                return framework
+        return None
+    
+    def select_paths(self, headers: Dict[str, str]) -> Tuple[str, ...]:
+        """Choose which paths to probe for a service based on its root response"""
+        framework = self.detect_framework(headers)
+        if framework is None:
+            return self.paths_to_check
+        # Known framework: only its bucket on top of the common paths
+        common = set(self.COMMON_PATHS)
+        return self.COMMON_PATHS + tuple(path for path in self.FRAMEWORK_PATHS[framework]
+                                         if path not in common)
+    
+    def _fingerprint(self, service: Service) -> None:
+        """Generate fingerprint based on headers and routes"""
+        # Feed each part to the hasher directly instead of concatenating strings;
+        # the digest is the same as hashing the joined data
+        server, powered_by = self._server_headers(service.headers)
+        h = fingerprint_hash()
+        h.update(server.encode())
+        h.update(powered_by.encode())
+        h.update(','.join(sorted(service.routes)).encode())
+        service.fingerprint = h.hexdigest()[:8]
+    
+    def discover_all(self, services: List[Service]) -> None:
+        """Discover HTTP routes for many services concurrently"""
+        services = list(services)
+        if HAS_AIOHTTP:
+            asyncio.run(self._discover_all(services))
+        else:
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                list(executor.map(self.discover_routes, services))
+    
+    def _async_client(self):
+        """Create the shared async HTTP client; must be called on a running event loop"""
+        # The connector limits bound how many probes are in flight at once, overall
+        # and per service, so small dev servers aren't flooded with every probe.
+        # Only socket connect/read time counts against the timeout, not waiting
+        # for a free connection in the pool.
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=200, limit_per_host=4, force_close=False),
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.timeout,
+                                          sock_read=self.timeout)
+        )
+    
+    async def _discover_all(self, services: List[Service]) -> None:
+        """Probe every (service, path) pair on one event loop and shared client"""
+        async with self._async_client() as client:
+            await asyncio.gather(*[self._discover_service(client, service)
+                                   for service in services])
+    
+    async def discover_stream(self, services: AsyncIterator[Service]) -> None:
+        """Start discovering each service as soon as the stream yields it
+        
+        Requires aiohttp.
+        """
+        async with self._async_client() as client:
+            pending = [asyncio.create_task(self._discover_service(client, service))
+                       async for service in services]
+            await asyncio.gather(*pending)
+    
+    async def _discover_service(self, client, service: Service) -> None:
+        """Discover HTTP routes for a service using the shared async client"""
+        base_url = f"http://localhost:{service.port}"
+        
+        # First, try to get the root
+        start = time.perf_counter()
+        result = await self._fetch(client, 'GET', base_url, read_body=True)
+        if result is None:
+            return
+        service.response_time = time.perf_counter() - start
+        status, service.headers, body = result
+        if self._rejects_http(status, body):
+            return
+        
+        paths = self.select_paths(service.headers)
+        statuses = {path: self.cache.get(service.port, path) for path in paths}
+        to_probe = [path for path, status in statuses.items() if status is None]
+        results = await asyncio.gather(*[self._fetch(client, 'HEAD', f"{base_url}{path}")
+                                         for path in to_probe])
+        for path, result in zip(to_probe, results):
+            if result is not None:
+                statuses[path] = result[0]
+                self.cache.set(service.port, path, result[0])
+        service.routes = [path for path in paths
+                          if statuses[path] is not None and statuses[path] < 400]
+        self._fingerprint(service)
+    
+    async def _fetch(self, client, method: str, url: str,
+                     read_body: bool = False) -> Optional[Tuple[int, Dict[str, str], str]]:
+        """Send a request on the async client, returning (status, headers, body) or None on failure
+        
+        Only the first 512 characters of the body are returned, and only if read_body is set.
+        """
+        try:
+            async with client.request(method, url, allow_redirects=True) as response:
+                body = ''
+                if read_body:
+                    body = (await response.content.read(512)).decode('latin-1')
+                return response.status, dict(response.headers), body
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return None
 
 
 class DuplicateDetector:
@@ -299,34 +672,27 @@ class DuplicateDetector:
     def find_duplicates(services: Dict[int, Service]) -> Dict[str, List[Service]]:
         """Group services that might be duplicates"""
         groups = {}
+        table = ServiceTable.from_services(services)
         
-        # Group by process name
-        by_process = {}
-        for service in services.values():
-            key = service.process_name
-            if key not in by_process:
-                by_process[key] = []
-            by_process[key].append(service)
-        
-        # Group by fingerprint
-        by_fingerprint = {}
-        for service in services.values():
-            if service.fingerprint:
-                if service.fingerprint not in by_fingerprint:
-                    by_fingerprint[service.fingerprint] = []
-                by_fingerprint[service.fingerprint].append(service)
+        # Group row indices by process name and by fingerprint in one pass
+        by_process = defaultdict(list)
+        by_fingerprint = defaultdict(list)
+        for i, process_name in enumerate(table.process_names):
+            by_process[process_name].append(i)
+            if (fingerprint := table.fingerprints[i]):
+                by_fingerprint[fingerprint].append(i)
         
         # Combine groups
         group_id = 0
-        for process_name, process_services in by_process.items():
-            if len(process_services) > 1:
+        for process_name, indices in by_process.items():
+            if len(indices) > 1:
                 group_id += 1
-                groups[f"process_{process_name}_{group_id}"] = process_services
+                groups[f"process_{process_name}_{group_id}"] = table.materialize(indices)
         
-        for fingerprint, fingerprint_services in by_fingerprint.items():
-            if len(fingerprint_services) > 1:
+        for fingerprint, indices in by_fingerprint.items():
+            if len(indices) > 1:
                 group_id += 1
-                groups[f"fingerprint_{fingerprint}_{group_id}"] = fingerprint_services
+                groups[f"fingerprint_{fingerprint}_{group_id}"] = table.materialize(indices)
                 
         return groups
 
@@ -336,7 +702,8 @@ class CLI:
     
     def __init__(self):
         self.scanner = PortScanner()
-        self.route_discovery = RouteDiscovery()
+        self.probe_cache = ProbeCache()
+        self.route_discovery = RouteDiscovery(cache=self.probe_cache)
         self.duplicate_detector = DuplicateDetector()
         
     def run(self, args):
@@ -356,22 +723,29 @@ class CLI:
             self.route_discovery.paths_to_check = self.route_discovery.ALL_PATHS
             print("🌐 Using comprehensive route discovery (all frameworks)")
         
-        # Scan ports
         if args.preset:
-            services = self.scanner.scan_ports(preset=args.preset)
+            scan_args = {'preset': args.preset}
         else:
-            services = self.scanner.scan_ports(args.start_port, args.end_port)
-        print(f"✅ Found {len(services)} open ports")
+            scan_args = {'start_port': args.start_port, 'end_port': args.end_port}
+        route_mode = "comprehensive" if args.comprehensive_routes else "standard"
         
-        # Discover routes
-        if not args.no_routes:
-            route_mode = "comprehensive" if args.comprehensive_routes else "standard"
-            print(f"🌐 Discovering HTTP routes ({route_mode} mode)...")
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                futures = [executor.submit(self.route_discovery.discover_routes, service) 
-                          for service in services.values()]
-                for future in as_completed(futures):
-                    pass
+        if not args.no_routes and HAS_AIOHTTP:
+            # Pipeline the two stages: each service's routes are probed as soon
+            # as its port is found open, while the rest of the scan continues
+            print(f"🌐 Discovering HTTP routes while scanning ({route_mode} mode)...")
+            asyncio.run(self.route_discovery.discover_stream(
+                self.scanner.scan_ports_stream(**scan_args)))
+            services = self.scanner.services
+            print(f"✅ Found {len(services)} open ports")
+        else:
+            # Scan ports
+            services = self.scanner.scan_ports(**scan_args)
+            print(f"✅ Found {len(services)} open ports")
+            
+            # Discover routes
+            if not args.no_routes:
+                print(f"🌐 Discovering HTTP routes ({route_mode} mode)...")
+                self.route_discovery.discover_all(services.values())
         
         # Display results
         self.display_services(services)
@@ -388,10 +762,13 @@ class CLI:
             
     def display_services(self, services: Dict[int, Service]):
         """Display services in a table format"""
-        print("\n📋 Running Services:")
-        print("-" * 120)
-        print(f"{'Port':<8} {'PID':<8} {'Process':<20} {'Routes':<40} {'Response Time':<15}")
-        print("-" * 120)
+        # Build the whole table and emit it with a single write
+        rows = [
+            "\n📋 Running Services:",
+            "-" * 120,
+            f"{'Port':<8} {'PID':<8} {'Process':<20} {'Routes':<40} {'Response Time':<15}",
+            "-" * 120
+        ]
         
         for port, service in sorted(services.items()):
             routes_str = ', '.join(service.routes[:3])
@@ -400,26 +777,40 @@ class CLI:
             
             response_time = f"{service.response_time*1000:.1f}ms" if service.response_time else "N/A"
             
-            print(f"{port:<8} {service.pid:<8} {service.process_name:<20} "
-                  f"{routes_str:<40} {response_time:<15}")
+            rows.append(f"{port:<8} {service.pid:<8} {service.process_name:<20} "
+                        f"{routes_str:<40} {response_time:<15}")
+        
+        sys.stdout.write("\n".join(rows) + "\n")
     
     def display_duplicates(self, duplicates: Dict[str, List[Service]]):
         """Display potential duplicate services"""
-        print("\n⚠️  Potential Duplicate Services:")
+        rows = ["\n⚠️  Potential Duplicate Services:"]
         for group_name, services in duplicates.items():
-            print(f"\n🔄 {group_name}:")
+            rows.append(f"\n🔄 {group_name}:")
             for service in services:
-                print(f"   - Port {service.port}: {service.process_name} "
-                      f"(PID: {service.pid})")
+                rows.append(f"   - Port {service.port}: {service.process_name} "
+                            f"(PID: {service.pid})")
+        
+        sys.stdout.write("\n".join(rows) + "\n")
     
     def export_json(self, services: Dict[int, Service], filename: str):
         """Export results to JSON"""
-        data = {
-            "scan_time": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "services": {str(port): asdict(service) for port, service in services.items()}
-        }
-        with open(filename, 'w') as f:
-            json.dump(data, f, indent=2)
+        scan_time = time.strftime("%Y-%m-%d %H:%M:%S")
+        if HAS_ORJSON:
+            # orjson serializes the Service dataclasses natively, skipping asdict()
+            data = {
+                "scan_time": scan_time,
+                "services": {str(port): service for port, service in services.items()}
+            }
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_DATACLASS))
+        else:
+            data = {
+                "scan_time": scan_time,
+                "services": {str(port): asdict(service) for port, service in services.items()}
+            }
+            with open(filename, 'w') as f:
+                json.dump(data, f, indent=2)
         print(f"\n💾 Results exported to {filename}")
     
     def show_presets(self):
@@ -436,7 +827,8 @@ class GUI:
     
     def __init__(self):
         self.scanner = PortScanner()
-        self.route_discovery = RouteDiscovery()
+        self.probe_cache = ProbeCache()
+        self.route_discovery = RouteDiscovery(cache=self.probe_cache)
         self.duplicate_detector = DuplicateDetector()
         self.services = {}
         
@@ -543,11 +935,7 @@ class GUI:
             
             # Discover routes
             if self.discover_routes_var.get():
-                with ThreadPoolExecutor(max_workers=10) as executor:
-                    futures = [executor.submit(self.route_discovery.discover_routes, service) 
-                              for service in self.services.values()]
-                    for future in as_completed(futures):
-                        pass
+                self.route_discovery.discover_all(self.services.values())
             
             # Update UI
             self.root.after(0, self._update_results)
@@ -0,0 +1,46 @@
+# -*- mode: python ; coding: utf-8 -*-
+# PyInstaller spec for Portsy. Build with build_installers.py, or directly:
+#   pyinstaller --noconfirm --workpath build/pyinstaller portsy.spec
+#
+# A single Analysis feeds both the console executable and the macOS app
+# bundle, so the module graph is only walked once per build.
+#
+# UPX is off unless PORTSY_UPX=1 (build_installers.py --upx sets it): it
+# slows the build and makes every launch decompress the binaries.
+
+import os
+import sys
+
+upx = os.environ.get('PORTSY_UPX') == '1'
+
+a = Analysis(
+    ['portsy.py'],
+    datas=[('README.md', '.'), ('LICENSE', '.')],
+)
+pyz = PYZ(a.pure)
+
+# Onedir layout: the executable sits next to its libraries in dist/portsy/
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='portsy',
+    console=True,
+    upx=upx,
+    icon='assets/icon.icns' if sys.platform == 'darwin' else 'assets/icon.ico',
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    upx=upx,
+    name='portsy',
+)
+
+if sys.platform == 'darwin':
+    app = BUNDLE(
+        coll,
+        name='Portsy.app',
+        icon='assets/icon.icns',
+    )
@@ -30,6 +30,8 @@ setup(
     ],
     extras_require={
         "gui": ["tkinter"],
+        "async": ["aiohttp>=3.8"],
+        "speedups": ["blake3", "orjson"],
     },
     entry_points={
         "console_scripts": [